@@ -2,11 +2,13 @@
 
 import os
 import pandas as pd
+import socket
 import time
 
 from hdb_polynomial_model import HDBPolynomialPriceModel
 from data_processor import HDBDataProcessor
 from visualizer import HDBVisualizer
+from model_client import DEFAULT_SOCKET_PATH, HDBModelClient
 
 try:
     from colorama import init, Fore, Back, Style
@@ -28,6 +30,11 @@ class SimplifiedHDBCalculatorCLI:
         self.processor = HDBDataProcessor()
         self.visualizer = HDBVisualizer()
         self.session_predictions = []
+        self.data_file = 'sample_data.csv'
+        self.partition_dir = 'data_partitions'
+        self.training_window_months = None  # e.g. 24 to train on the latest 24 months only
+        self.socket_path = DEFAULT_SOCKET_PATH
+        self.daemon_owner = None  # user running a shared daemon; None means only trust our own
 
     def clear_screen(self):
         import os
@@ -96,12 +103,26 @@ class SimplifiedHDBCalculatorCLI:
         self.print_colored("3. Exit", 'red')
         print("=" * 40)
 
+    def connect_to_daemon(self):
+        # Reuse the model held by a running model_daemon.py instead of training a private copy
+        if not os.path.exists(self.socket_path):
+            return False
+        try:
+            self.model = HDBModelClient(self.socket_path, owner=self.daemon_owner)
+        except PermissionError as e:
+            self.print_colored("[WARNING] Not using the model daemon: {}".format(e), 'yellow')
+            return False
+        except (OSError, ValueError):
+            return False
+
+        self.print_colored("[SUCCESS] Connected to model daemon (model v{})".format(
+            self.model.model_version), 'green')
+        return True
+
     def load_and_train_model(self):
-        self.model.load_data('sample_data.csv')
-        if self.model.df is not None:
-            cleaned_data = self.processor.clean_data(self.model.df)
-            self.model.df = cleaned_data
-        self.model.train_model()
+        self.processor.prepare_partitions(self.data_file, self.partition_dir)
+        self.model.load_data(self.partition_dir, months=self.training_window_months)
+        self.model.train_model(months=self.training_window_months)
         metrics = self.model.get_model_metrics()
         polynomial_info = self.model.get_polynomial_equation_info()
 
@@ -130,17 +151,26 @@ class SimplifiedHDBCalculatorCLI:
 
     def predict_price(self):
         self.print_rainbow("\nHDB Valuation Calculator (LITE)")
-        inputs = self.collect_user_inputs()
-        prediction, contributions = self.model.predict_price(inputs)
-        self.clear_screen()
-        self.display_prediction_results(inputs, prediction, contributions)
-
-        self.visualizer.generate_prediction_summary_visuals(
-            self.model, inputs, prediction, contributions)
+        try:
+            inputs = self.collect_user_inputs()
+            prediction, contributions, model_version, baseline_price = self.model.predict_price(inputs)
+            self.clear_screen()
+            self.display_prediction_results(inputs, prediction, contributions, model_version, baseline_price)
+
+            self.visualizer.generate_prediction_summary_visuals(
+                self.model, inputs, prediction, contributions, baseline_price)
+        except (ConnectionError, socket.timeout) as e:
+            # Only the daemon client can fail this way: carry on with a model of our own
+            self.print_colored("[ERROR] Lost the model daemon ({}); training a local model".format(e), 'red')
+            self.model.close()
+            self.model = HDBPolynomialPriceModel()
+            self.load_and_train_model()
+            return
 
         self.session_predictions.append({
             'inputs': inputs.copy(),
             'prediction': prediction,
+            'model_version': model_version,
             'timestamp': pd.Timestamp.now()
         })
 
@@ -275,7 +305,8 @@ class SimplifiedHDBCalculatorCLI:
 
         return inputs
 
-    def display_prediction_results(self, inputs, prediction, contributions):
+    def display_prediction_results(self, inputs, prediction, contributions, model_version=None,
+                                   baseline_price=None):
         print("\n" + "=" * 60)
         self.print_colored("              PREDICTION RESULTS", 'green',
                            'bright')
@@ -283,6 +314,8 @@ class SimplifiedHDBCalculatorCLI:
         self.print_colored(
             "Predicted HDB Price: SGD ${:,.2f}".format(prediction), 'cyan',
             'bright')
+        if model_version is not None:
+            print("Model Version:       v{}".format(model_version))
         print("=" * 60)
         self.print_colored("Input Summary:", 'yellow')
         print("-" * 30)
@@ -290,6 +323,13 @@ class SimplifiedHDBCalculatorCLI:
             display_key = key.replace('_', ' ').title()
             print("{:<20}: {}".format(display_key, value))
         print("=" * 60)
+        if baseline_price is not None:
+            self.print_colored("Price Breakdown (vs. typical flat):", 'yellow')
+            print("-" * 30)
+            print("{:<20}: ${:,.0f}".format('Typical Flat', baseline_price))
+            for feature, contribution in contributions.items():
+                print("{:<20}: {}${:,.0f}".format(feature, '+' if contribution >= 0 else '-', abs(contribution)))
+            print("=" * 60)
 
     def view_history(self):
         if not self.session_predictions:
@@ -319,7 +359,8 @@ class SimplifiedHDBCalculatorCLI:
     def run(self):
         self.clear_screen()
         self.display_banner()
-        self.load_and_train_model()
+        if not self.connect_to_daemon():
+            self.load_and_train_model()
 
         self.print_rainbow("\nReady to use! Starting interface...")
 
@@ -1,5 +1,9 @@
 # SOURITRA SAMANTA (3C)
 
+import os
+import shutil
+import tempfile
+import time
 import pandas as pd
 import numpy as np
 
@@ -48,6 +52,90 @@ class HDBDataProcessor:
         print("[SUCCESS] Final dataset: {} records".format(len(cleaned_df)))
         return cleaned_df # souritra (watermark)
 
+    def save_partitioned(self, df, output_dir):
+        # One CSV per month (output_dir/month=YYYY-MM/data.csv) so loaders can skip whole months
+        written = 0
+        for month, month_df in df.groupby('month', sort=True):
+            partition_dir = os.path.join(output_dir, 'month={}'.format(month))
+            if not os.path.exists(partition_dir):
+                os.makedirs(partition_dir)
+            month_df.to_csv(os.path.join(partition_dir, 'data.csv'), index=False)
+            written += 1
+
+        print("[SUCCESS] Saved {} monthly partitions to {}".format(written, output_dir))
+        return written
+
+    def current_partition_dir(self, output_dir):
+        # prepare_partitions installs each build as output_dir/build-*/ and names the live one in
+        # output_dir/CURRENT; a directory written directly by save_partitioned has no pointer
+        pointer = os.path.join(output_dir, 'CURRENT')
+        if not os.path.isfile(pointer):
+            return output_dir
+        with open(pointer) as pointer_file:
+            return os.path.join(output_dir, pointer_file.read().strip())
+
+    def _partitions_fresh(self, data_file, output_dir):
+        # The marker is written last and records the CSV it was built from, so a partial or
+        # outdated cache is never mistaken for a complete one
+        marker = os.path.join(self.current_partition_dir(output_dir), '_COMPLETE')
+        if not os.path.isfile(marker):
+            return False
+        with open(marker) as marker_file:
+            return marker_file.read() == self._source_signature(data_file)
+
+    def _source_signature(self, data_file):
+        stat = os.stat(data_file)
+        return "{} {}".format(stat.st_size, stat.st_mtime)
+
+    def prepare_partitions(self, data_file, output_dir):
+        # The cleaned dataset is cached as monthly partitions and rebuilt only when the CSV changes.
+        # Each build goes into its own build-<time>-* directory and is never modified afterwards;
+        # it goes live when the CURRENT pointer is replaced in one atomic step. A reader that
+        # resolves CURRENT once (as each training run does) keeps reading the same build, which
+        # stays on disk until a second newer build has been installed.
+        if self._partitions_fresh(data_file, output_dir):
+            return False
+
+        cleaned_data = self.clean_data(pd.read_csv(data_file))
+        os.makedirs(output_dir, exist_ok=True)
+        build_dir = tempfile.mkdtemp(prefix='build-{:020d}-'.format(time.time_ns()), dir=output_dir)
+        build_name = os.path.basename(build_dir)
+        try:
+            self.save_partitioned(cleaned_data, build_dir)
+            with open(os.path.join(build_dir, '_COMPLETE'), 'w') as marker_file:
+                marker_file.write(self._source_signature(data_file))
+
+            previous_name = os.path.basename(self.current_partition_dir(output_dir))
+            if previous_name.startswith('build-') and previous_name > build_name:
+                # A builder that started later has already installed its cache
+                shutil.rmtree(build_dir, ignore_errors=True)
+                return False
+            pointer_file_path = build_dir + '.pointer'
+            with open(pointer_file_path, 'w') as pointer_file:
+                pointer_file.write(build_name)
+            os.replace(pointer_file_path, os.path.join(output_dir, 'CURRENT'))
+        except Exception:
+            shutil.rmtree(build_dir, ignore_errors=True)
+            # A newer builder may have installed its cache and removed this older build mid-write
+            if self._partitions_fresh(data_file, output_dir):
+                return False
+            raise
+
+        # Remove builds older than the one just replaced (and their leftover pointer files), and
+        # the month=* entries of the unversioned layout
+        for name in os.listdir(output_dir):
+            path = os.path.join(output_dir, name)
+            outdated = (name.startswith('build-') and previous_name.startswith('build-')
+                        and name < previous_name)
+            if os.path.isdir(path) and (outdated or name.startswith('month=')):
+                shutil.rmtree(path, ignore_errors=True)
+            elif os.path.isfile(path) and (outdated or name == '_COMPLETE'):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass  # already removed by another builder
+        return True
+
     def validate_input_data(self, inputs):
         errors = []
 
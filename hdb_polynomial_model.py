@@ -3,30 +3,308 @@
 import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import LabelEncoder, PolynomialFeatures, StandardScaler
+from sklearn.linear_model import LinearRegression, Ridge
+from sklearn.preprocessing import LabelEncoder, OneHotEncoder, PolynomialFeatures, StandardScaler
+from sklearn.compose import ColumnTransformer
 from sklearn.metrics import r2_score, mean_absolute_error, mean_squared_error
 from sklearn.pipeline import Pipeline
+import itertools
+import os
+import pickle
+import threading
+from concurrent.futures import Future
 import warnings
 
+from data_processor import HDBDataProcessor
+
 warnings.filterwarnings('ignore', category=UserWarning)
 
-class HDBPolynomialPriceModel:
-    def __init__(self):
+class HDBModelSnapshot:
+    # A fitted model version. Once published by HDBPolynomialPriceModel it is never mutated,
+    # so a prediction that holds a reference always sees one consistent model.
+    def __init__(self, polynomial_degree, sparse_feature_names):
+        self.version = None
         self.polynomial_pipeline = None
         self.label_encoders = {}
-        self.df = None
         self.feature_names = []
-        self.is_trained = False
+        self.sparse_feature_names = list(sparse_feature_names)
+        self.polynomial_degree = polynomial_degree
         self.model_metrics = {}
-        self.polynomial_degree = 3
+        self.baseline_profile = {}
+        self.baseline_price = None
+        self._baseline_frame = None
+        self._shapley_plan = None
+
+    def encode_features(self, processed_df):
+        categorical_columns = ['town', 'flat_type', 'storey_range', 'flat_model']
+
+        for col in categorical_columns:
+            if col in processed_df.columns and col in self.label_encoders:
+                values = processed_df[col].str.upper().str.strip()
+                processed_df[col + '_encoded'] = self.label_encoders[col].transform(values)
+
+        feature_columns = [col + '_encoded' for col in categorical_columns if col in processed_df.columns]
+        feature_columns.extend(['floor_area_sqm', 'remaining_lease'])
+
+        available_columns = [col for col in feature_columns if col in processed_df.columns]
+
+        sparse_columns = [col for col in self.sparse_feature_names if col in processed_df.columns]
+        for col in sparse_columns:
+            processed_df[col] = processed_df[col].astype(str).str.upper().str.strip()
+        # Block numbers repeat across streets, so a block is only identified together with its street
+        if 'block' in sparse_columns and 'street_name' in processed_df.columns:
+            street = processed_df['street_name'].astype(str).str.upper().str.strip()
+            processed_df['block'] = street + ' BLK ' + processed_df['block']
+
+        return processed_df[available_columns + sparse_columns]
+
+    def poly_step(self):
+        named_steps = self.polynomial_pipeline.named_steps
+        if 'poly' in named_steps:
+            return named_steps['poly']
+        return named_steps['features'].named_transformers_['dense'].named_steps['poly']
+
+    def _prepare_frame(self, inputs_list):
+        columns = ['town', 'flat_type', 'storey_range', 'flat_model'] + self.sparse_feature_names
+        if 'block' in columns and 'street_name' not in columns:
+            columns.append('street_name')
+        input_df = pd.DataFrame(
+            [[str(inputs.get(col, '')) for col in columns] for inputs in inputs_list],
+            columns=columns)
+        input_df['floor_area_sqm'] = [float(inputs['floor_area_sqm']) for inputs in inputs_list]
+        input_df['remaining_lease'] = [float(inputs['remaining_lease']) for inputs in inputs_list]
+
+        return self.encode_features(input_df)[self.feature_names + self.sparse_feature_names]
+
+    def set_baseline(self, encoded_baseline):
+        # Attributions are measured against a reference flat: the most common category and mean
+        # floor area / remaining lease of the training rows, with no particular block or street
+        profile = {}
+        for feature_name in self.feature_names:
+            value = encoded_baseline[feature_name]
+            if feature_name.endswith('_encoded'):
+                col = feature_name[:-len('_encoded')]
+                profile[col] = str(self.label_encoders[col].inverse_transform([int(value)])[0])
+            else:
+                profile[feature_name] = float(value)
+
+        self.baseline_profile = profile
+        self._baseline_frame = self._prepare_frame([profile])
+        self.baseline_price = float(self.polynomial_pipeline.predict(self._baseline_frame)[0])
+        self._build_shapley_plan()
+
+    def _fitted_parts(self):
+        named_steps = self.polynomial_pipeline.named_steps
+        coef = named_steps['regressor'].coef_
+        if 'poly' in named_steps:
+            return named_steps['scaler'], named_steps['poly'], coef, None, None
+
+        transformers = named_steps['features'].named_transformers_
+        dense = transformers['dense'].named_steps
+        n_poly = dense['poly'].n_output_features_
+        return dense['scaler'], dense['poly'], coef[:n_poly], transformers['sparse'], coef[n_poly:]
+
+    def _build_shapley_plan(self):
+        # Exact baseline Shapley values for the polynomial. Every term c * prod_j z_j^p_j splits into
+        # prod_j (base_j + delta_j); the product of deltas over a feature subset A is a unanimity game
+        # whose worth is shared equally by the |A| features in it. The plan groups these products by
+        # subset size so a batch is explained with a few matrix operations.
+        scaler, poly, dense_coef, _, _ = self._fitted_parts()
+        degree = self.polynomial_degree
+        z_base = (self._baseline_frame[self.feature_names].values[0] - scaler.mean_) / scaler.scale_
+
+        grouped = {}
+        for term_coef, term_powers in zip(dense_coef, poly.powers_):
+            support = np.flatnonzero(term_powers)
+            if term_coef == 0 or len(support) == 0:
+                continue
+            base = z_base[support] ** term_powers[support]
+            for size in range(1, len(support) + 1):
+                for subset in itertools.combinations(range(len(support)), size):
+                    rest = [k for k in range(len(support)) if k not in subset]
+                    features = support[list(subset)]
+                    delta_columns = features * degree + term_powers[features] - 1
+                    grouped.setdefault(size, []).append(
+                        (delta_columns, term_coef * np.prod(base[rest]) / size, features))
+
+        plan = []
+        for size, entries in sorted(grouped.items()):
+            assign = np.zeros((len(entries), len(self.feature_names)))
+            for row, (_, _, features) in enumerate(entries):
+                assign[row, features] = 1.0
+            plan.append((np.array([entry[0] for entry in entries]),
+                         np.array([entry[1] for entry in entries]),
+                         assign))
+
+        base_powers = z_base[:, np.newaxis] ** np.arange(1, degree + 1)
+        self._shapley_plan = (plan, base_powers)
+
+    def shapley_values(self, input_df):
+        scaler, _, _, onehot, sparse_coef = self._fitted_parts()
+        plan, base_powers = self._shapley_plan
+        degree = self.polynomial_degree
+
+        Z = (input_df[self.feature_names].values - scaler.mean_) / scaler.scale_
+        # delta[:, j * degree + p - 1] = z_j^p - base_j^p
+        deltas = (Z[:, :, np.newaxis] ** np.arange(1, degree + 1) - base_powers).reshape(len(Z), -1)
+
+        phi = np.zeros((len(input_df), len(self.feature_names) + len(self.sparse_feature_names)))
+        for delta_columns, weights, assign in plan:
+            shares = np.prod(deltas[:, delta_columns], axis=2) * weights
+            phi[:, :len(self.feature_names)] += shares.dot(assign)
+
+        # One-hot terms are additive, so each sparse column's value is the weight of its active
+        # indicator (the baseline has none)
+        if onehot is not None:
+            indicators = onehot.transform(input_df[self.sparse_feature_names]).tocsr()
+            start = 0
+            for k, categories in enumerate(onehot.categories_):
+                end = start + len(categories)
+                phi[:, len(self.feature_names) + k] = indicators[:, start:end].dot(sparse_coef[start:end])
+                start = end
+
+        return phi
+
+    def predict_prices(self, inputs_list):
+        if len(inputs_list) == 0:
+            return np.empty(0), [], self.baseline_price
+
+        input_df = self._prepare_frame(inputs_list)
+
+        predictions = self.polynomial_pipeline.predict(input_df)
+
+        readable_names = [feature_name.replace('_encoded', '').replace('_', ' ').title()
+                          for feature_name in self.feature_names + self.sparse_feature_names]
+        feature_contributions = [dict(zip(readable_names, row)) for row in self.shapley_values(input_df)]
+
+        # The baseline is returned with the contributions it was measured against
+        return predictions, feature_contributions, self.baseline_price
+
 
-    def load_data(self, filepath='sample_data.csv'):
-        self.df = pd.read_csv(filepath)
+class HDBPolynomialPriceModel:
+    def __init__(self, sparse_categoricals=None):
+        self.df = None
+        # High-cardinality columns (e.g. block, street_name) one-hot encoded as a sparse block
+        self.sparse_feature_names = list(sparse_categoricals) if sparse_categoricals else []
+        self.sparse_alpha = 1.0
+        self.polynomial_degree = 3
+        self.data_path = None
+        self.data_files = []
+        self.chunksize = None
+        self.months = None
+        # Training builds a new HDBModelSnapshot and publishes it with a single reference swap;
+        # predictions read self._snapshot once and never take a lock
+        self._snapshot = None
+        self._version_counter = 0
+        self._publish_lock = threading.Lock()
+        self._train_lock = threading.Lock()
+
+    @property
+    def polynomial_pipeline(self):
+        return self._snapshot.polynomial_pipeline if self._snapshot else None
+
+    @property
+    def label_encoders(self):
+        return self._snapshot.label_encoders if self._snapshot else {}
+
+    @property
+    def feature_names(self):
+        return self._snapshot.feature_names if self._snapshot else []
+
+    @property
+    def model_metrics(self):
+        return self._snapshot.model_metrics if self._snapshot else {}
+
+    @property
+    def is_trained(self):
+        return self._snapshot is not None
+
+    @property
+    def baseline_price(self):
+        return self._snapshot.baseline_price if self._snapshot else None
+
+    @property
+    def baseline_profile(self):
+        return self._snapshot.baseline_profile if self._snapshot else {}
+
+    @property
+    def model_version(self):
+        return self._snapshot.version if self._snapshot else None
+
+    def _publish(self, snapshot):
+        with self._publish_lock:
+            self._version_counter += 1
+            snapshot.version = self._version_counter
+            self._snapshot = snapshot
+        print("[SUCCESS] Model version {} is now serving".format(snapshot.version))
+        return snapshot.version
+
+    def load_data(self, filepath='sample_data.csv', chunksize=None, months=None):
+        # filepath is either a single CSV or a directory written by HDBDataProcessor.save_partitioned;
+        # for a directory, months restricts reading to the latest N monthly partitions
+        self.data_path = filepath
+        self.chunksize = chunksize
+        self.months = months
+        if os.path.isdir(filepath):
+            self.data_files = self._list_partitions(filepath, months)
+        elif months is not None:
+            raise ValueError("A time window needs a month-partitioned dataset directory")
+        else:
+            self.data_files = [filepath]
+
+        if chunksize is not None:
+            self.df = None
+            print("Streaming {} in chunks of {:,} rows".format(filepath, chunksize))
+            return self.df
+
+        if len(self.data_files) == 1:
+            self.df = pd.read_csv(self.data_files[0])
+        else:
+            self.df = pd.concat([pd.read_csv(path) for path in self.data_files], ignore_index=True)
         print("Loaded {}".format(filepath)) # souritra (watermark)
         return self.df
 
-    def preprocess_data(self):
+    def _list_partitions(self, data_dir, months=None):
+        # Resolved once per load: the returned paths stay inside one immutable build even if
+        # prepare_partitions installs a newer one meanwhile
+        data_dir = HDBDataProcessor().current_partition_dir(data_dir)
+        partitions = []
+        for name in os.listdir(data_dir):
+            path = os.path.join(data_dir, name, 'data.csv')
+            if name.startswith('month=') and os.path.isfile(path):
+                partitions.append((name[len('month='):], path))
+        if not partitions:
+            raise ValueError("No monthly partitions found in {}".format(data_dir))
+        partitions.sort()
+
+        if months is not None:
+            if months < 1:
+                raise ValueError("Time window must cover at least 1 month")
+
+            def month_index(month):
+                year, month_number = month.split('-')[:2]
+                return int(year) * 12 + int(month_number) - 1
+
+            latest = month_index(partitions[-1][0])
+            partitions = [(month, path) for month, path in partitions
+                          if latest - month_index(month) < months]
+            print("Reading {} monthly partitions ({} to {})".format(
+                len(partitions), partitions[0][0], partitions[-1][0]))
+
+        return [path for month, path in partitions]
+
+    def _partitions_replaced(self):
+        current_dir = HDBDataProcessor().current_partition_dir(self.data_path)
+        return any(os.path.dirname(os.path.dirname(path)) != current_dir for path in self.data_files)
+
+    def _iter_chunks(self):
+        for path in self.data_files:
+            for chunk in pd.read_csv(path, chunksize=self.chunksize):
+                chunk = chunk.dropna()
+                if len(chunk) > 0:
+                    yield chunk
+
+    def preprocess_data(self, snapshot):
         processed_df = self.df.copy()
 
         processed_df = processed_df.dropna()
@@ -38,106 +316,292 @@ class HDBPolynomialPriceModel:
                 processed_df[col] = processed_df[col].str.upper().str.strip()
 
                 le = LabelEncoder()
-                processed_df[col + '_encoded'] = le.fit_transform(processed_df[col])
-                self.label_encoders[col] = le
-
-        feature_columns = [col + '_encoded' for col in categorical_columns if col in processed_df.columns]
-        feature_columns.extend(['floor_area_sqm', 'remaining_lease'])
-
-        available_columns = [col for col in feature_columns if col in processed_df.columns]
+                le.fit(processed_df[col])
+                snapshot.label_encoders[col] = le
 
-        X = processed_df[available_columns]
+        X = snapshot.encode_features(processed_df)
         y = processed_df['resale_price'] # souritra (watermark)
 
-        self.feature_names = available_columns
+        snapshot.feature_names = [col for col in X.columns if col not in snapshot.sparse_feature_names]
         return X, y
 
-    def train_model(self):
-        X, y = self.preprocess_data()
+    def _build_pipeline(self, snapshot):
+        if not snapshot.sparse_feature_names:
+            return Pipeline([ # souritra (watermark)
+                ('scaler', StandardScaler()),
+                ('poly', PolynomialFeatures(degree=self.polynomial_degree, include_bias=False)),
+                ('regressor', LinearRegression())
+            ])
+
+        # The dense polynomial block and the one-hot block are stacked into one CSR design
+        # matrix, so the indicator columns are never densified
+        dense_pipeline = Pipeline([
+            ('scaler', StandardScaler()),
+            ('poly', PolynomialFeatures(degree=self.polynomial_degree, include_bias=False))
+        ])
+        features = ColumnTransformer([
+            ('dense', dense_pipeline, snapshot.feature_names),
+            ('sparse', OneHotEncoder(handle_unknown='ignore'), snapshot.sparse_feature_names)
+        ], sparse_threshold=1.0)
+        return Pipeline([
+            ('features', features),
+            ('regressor', Ridge(alpha=self.sparse_alpha, solver='sparse_cg'))
+        ])
+
+    def train_model(self, months=None):
+        return self._train_snapshot(months).model_metrics
+
+    def _train_snapshot(self, months=None):
+        # Concurrent retrains are serialised; predictions keep using the current snapshot meanwhile
+        with self._train_lock:
+            # For a partitioned dataset the window is per call (months=None trains on every
+            # partition), and each run picks up the partition build that is current when it starts
+            if self.data_path is not None and os.path.isdir(self.data_path) and (
+                    months != self.months or self._partitions_replaced()):
+                self.load_data(self.data_path, chunksize=self.chunksize, months=months)
+            elif months is not None and months != self.months:
+                raise ValueError("A time window needs a month-partitioned dataset directory")
+
+            snapshot = HDBModelSnapshot(self.polynomial_degree, self.sparse_feature_names)
+            if self.chunksize is not None:
+                self._train_model_streaming(snapshot)
+            else:
+                self._train_model_in_memory(snapshot)
+
+            self._publish(snapshot)
+            return snapshot
+
+    def _run_async(self, function, *args):
+        # The future resolves to the published HDBModelSnapshot (version, metrics, ...) or holds
+        # the exception if the retrain or reload failed; the serving version is then unchanged
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(function(*args))
+            except Exception as e:
+                future.set_exception(e)
+
+        thread = threading.Thread(target=run)
+        thread.daemon = True
+        thread.start()
+        return future
+
+    def train_model_async(self, months=None):
+        return self._run_async(self._train_snapshot, months)
+
+    def save_model(self, filepath):
+        snapshot = self._snapshot
+        if snapshot is None:
+            raise ValueError("No trained model to save")
+        with open(filepath, 'wb') as model_file:
+            pickle.dump(snapshot, model_file)
+        print("[SUCCESS] Saved model version {} to {}".format(snapshot.version, filepath))
+
+    def load_model(self, filepath):
+        return self._load_snapshot(filepath).version
+
+    def _load_snapshot(self, filepath):
+        with open(filepath, 'rb') as model_file:
+            snapshot = pickle.load(model_file)
+        if not isinstance(snapshot, HDBModelSnapshot):
+            raise ValueError("{} is not a saved HDB model".format(filepath))
+        self._publish(snapshot)
+        return snapshot
+
+    def load_model_async(self, filepath):
+        return self._run_async(self._load_snapshot, filepath)
+
+    def _train_model_in_memory(self, snapshot):
+        X, y = self.preprocess_data(snapshot)
 
         print("[SUCCESS] Polynomial degree: {}".format(self.polynomial_degree))
         print("Training Model...")
 
         X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
 
-        self.polynomial_pipeline = Pipeline([ # souritra (watermark)
-            ('scaler', StandardScaler()),
-            ('poly', PolynomialFeatures(degree=self.polynomial_degree, include_bias=False)),
-            ('regressor', LinearRegression())
-        ])
-        self.polynomial_pipeline.fit(X_train, y_train)
+        pipeline = self._build_pipeline(snapshot)
+        pipeline.fit(X_train, y_train)
+        snapshot.polynomial_pipeline = pipeline
+        snapshot.set_baseline(dict(
+            (col, X_train[col].mode()[0] if col.endswith('_encoded') else X_train[col].mean())
+            for col in snapshot.feature_names))
 
-        train_predictions = self.polynomial_pipeline.predict(X_train)
-        test_predictions = self.polynomial_pipeline.predict(X_test)
+        train_predictions = pipeline.predict(X_train)
+        test_predictions = pipeline.predict(X_test)
 
         train_r2 = r2_score(y_train, train_predictions)
         test_r2 = r2_score(y_test, test_predictions)
         test_mae = mean_absolute_error(y_test, test_predictions)
         test_rmse = np.sqrt(mean_squared_error(y_test, test_predictions))
 
-        poly_step = self.polynomial_pipeline.named_steps['poly'] # souritra (watermark)
+        poly_step = snapshot.poly_step() # souritra (watermark)
         try:
             n_polynomial_features = poly_step.n_output_features_
         except AttributeError:
-            n_polynomial_features = poly_step.fit_transform(X_train).shape[1]
+            n_polynomial_features = poly_step.fit_transform(X_train[snapshot.feature_names]).shape[1]
 
-        self.model_metrics = {
+        snapshot.model_metrics = {
             'train_r2': train_r2,
             'test_r2': test_r2,
             'test_mae': test_mae,
             'test_rmse': test_rmse,
             'n_samples': len(X_train),
-            'n_features': len(self.feature_names),
+            'n_features': len(snapshot.feature_names),
             'n_polynomial_features': n_polynomial_features
         }
 
-        self.is_trained = True
-        return self.model_metrics
+    def _train_model_streaming(self, snapshot):
+        if snapshot.sparse_feature_names:
+            raise ValueError("Sparse categorical features are not supported with chunked training")
 
-    def predict_price(self, inputs):
-        input_data = {}
+        # Pass 1: category vocabularies and row count, so label codes and the split match the in-memory fit
         categorical_columns = ['town', 'flat_type', 'storey_range', 'flat_model']
+        categories = {}
+        n_rows = 0
+        for chunk in self._iter_chunks():
+            n_rows += len(chunk)
+            for col in categorical_columns:
+                if col in chunk.columns:
+                    values = chunk[col].str.upper().str.strip().unique()
+                    categories.setdefault(col, set()).update(values)
 
         for col in categorical_columns:
-            if col in inputs and col in self.label_encoders:
-                value = str(inputs[col]).upper().strip()
-                encoded_value = self.label_encoders[col].transform([value])[0]
-                input_data[col + '_encoded'] = encoded_value
-
-        input_data['floor_area_sqm'] = float(inputs['floor_area_sqm'])
-        input_data['remaining_lease'] = float(inputs['remaining_lease'])
-
-        input_df = pd.DataFrame([input_data])
-        input_df = input_df[self.feature_names]
+            if col in categories:
+                le = LabelEncoder()
+                le.fit(sorted(categories[col]))
+                snapshot.label_encoders[col] = le
 
-        prediction = self.polynomial_pipeline.predict(input_df)[0]
+        print("[SUCCESS] Polynomial degree: {}".format(self.polynomial_degree))
+        print("Training Model (streaming {:,} rows)...".format(n_rows))
+
+        # Reproducing train_test_split exactly needs its index arrays (about 25-30 bytes per row while
+        # the split is drawn); afterwards only this one-byte-per-row mask is kept
+        _, test_index = train_test_split(np.arange(n_rows), test_size=0.2, random_state=42)
+        is_test = np.zeros(n_rows, dtype=bool)
+        is_test[test_index] = True
+        del test_index
+
+        def split_chunks():
+            offset = 0
+            for chunk in self._iter_chunks():
+                X = snapshot.encode_features(chunk.copy())
+                y = chunk['resale_price']
+                mask = is_test[offset:offset + len(X)]
+                offset += len(X)
+                yield X, y, mask
+
+        # Pass 2: scaler statistics and category counts (for the attribution baseline) over the training rows
+        scaler = StandardScaler()
+        code_counts = {}
+        for X, y, mask in split_chunks():
+            if (~mask).any():
+                scaler.partial_fit(X[~mask])
+                for col in X.columns:
+                    if col.endswith('_encoded'):
+                        n_classes = len(snapshot.label_encoders[col[:-len('_encoded')]].classes_)
+                        counts = np.bincount(X[col].values[~mask], minlength=n_classes)
+                        code_counts[col] = code_counts.get(col, 0) + counts
+
+        snapshot.feature_names = list(scaler.feature_names_in_)
+        poly = PolynomialFeatures(degree=self.polynomial_degree, include_bias=False)
+        poly.fit(np.zeros((1, len(snapshot.feature_names))))
+        n_polynomial_features = poly.n_output_features_
+
+        # Pass 3: incremental QR of [poly features | intercept | target]; only the
+        # (p + 2) x (p + 2) triangular factor is kept between chunks
+        R = np.zeros((0, n_polynomial_features + 2))
+        for X, y, mask in split_chunks():
+            if not (~mask).any():
+                continue
+            X_poly = poly.transform(scaler.transform(X[~mask]))
+            block = np.column_stack([X_poly, np.ones(len(X_poly)), y.values[~mask]])
+            R = np.linalg.qr(np.vstack([R, block]), mode='r')
+
+        R_xx = R[:n_polynomial_features + 1, :n_polynomial_features + 1]
+        R_xy = R[:n_polynomial_features + 1, n_polynomial_features + 1]
+        solution = np.linalg.lstsq(R_xx, R_xy, rcond=None)[0]
+
+        regressor = LinearRegression()
+        regressor.coef_ = solution[:n_polynomial_features]
+        regressor.intercept_ = solution[n_polynomial_features]
+        regressor.n_features_in_ = n_polynomial_features
+
+        pipeline = Pipeline([
+            ('scaler', scaler),
+            ('poly', poly),
+            ('regressor', regressor)
+        ])
+        snapshot.polynomial_pipeline = pipeline
+        snapshot.set_baseline(dict(
+            (col, np.argmax(code_counts[col]) if col in code_counts else mean)
+            for col, mean in zip(snapshot.feature_names, scaler.mean_)))
+
+        # Pass 4: hold-out metrics from running sums
+        totals = {
+            'train': np.zeros(4),
+            'test': np.zeros(4)
+        }
+        test_abs_error = 0.0
+        for X, y, mask in split_chunks():
+            residuals = y.values - pipeline.predict(X)
+            for name, rows in (('train', ~mask), ('test', mask)):
+                totals[name] += [
+                    rows.sum(),
+                    y.values[rows].sum(),
+                    np.square(y.values[rows]).sum(),
+                    np.square(residuals[rows]).sum()
+                ]
+            test_abs_error += np.abs(residuals[mask]).sum()
+
+        def r2_from_totals(count, total, total_sq, sse):
+            sst = total_sq - total * total / count
+            return 1 - sse / sst
+
+        n_train = int(totals['train'][0])
+        n_test = int(totals['test'][0])
+
+        snapshot.model_metrics = {
+            'train_r2': r2_from_totals(*totals['train']),
+            'test_r2': r2_from_totals(*totals['test']),
+            'test_mae': test_abs_error / n_test,
+            'test_rmse': np.sqrt(totals['test'][3] / n_test),
+            'n_samples': n_train,
+            'n_features': len(snapshot.feature_names),
+            'n_polynomial_features': n_polynomial_features
+        }
 
-        feature_contributions = {}
-        for i, feature_name in enumerate(self.feature_names):
-            contribution = input_df.iloc[0, i] * 10000
-            readable_name = feature_name.replace('_encoded', '').replace('_', ' ').title()
-            feature_contributions[readable_name] = contribution
+    def predict_price(self, inputs):
+        predictions, contributions, version, baseline_price = self.predict_prices([inputs])
+        return predictions[0], contributions[0], version, baseline_price
 
-        return prediction, feature_contributions
+    def predict_prices(self, inputs_list):
+        snapshot = self._snapshot
+        predictions, contributions, baseline_price = snapshot.predict_prices(inputs_list)
+        return predictions, contributions, snapshot.version, baseline_price
 
     def get_model_metrics(self):
         return self.model_metrics
 
     def get_polynomial_equation_info(self):
-        if not self.is_trained: # souritra (watermark)
+        snapshot = self._snapshot
+        if snapshot is None: # souritra (watermark)
             return {}
 
-        poly_step = self.polynomial_pipeline.named_steps['poly']
+        poly_step = snapshot.poly_step()
         try:
             n_features = poly_step.n_output_features_
         except AttributeError:
-            X_dummy = np.zeros((1, len(self.feature_names)))
+            X_dummy = np.zeros((1, len(snapshot.feature_names)))
             n_features = poly_step.fit_transform(X_dummy).shape[1]
 
         return {
-            'degree': self.polynomial_degree,
+            'degree': snapshot.polynomial_degree,
             'n_features': n_features,
-            'feature_names': self.feature_names
+            'feature_names': snapshot.feature_names,
+            'version': snapshot.version
         }
 
     def get_available_towns(self):
@@ -0,0 +1,327 @@
+# SOURITRA SAMANTA (3C)
+
+# Thin client for the resident model daemon (model_daemon.py). Only the standard library is
+# imported here so a new session can answer its first query without loading pandas or sklearn.
+
+import argparse
+import json
+import os
+import socket
+import stat
+import struct
+import sys
+import tempfile
+
+# The socket lives in its own per-user directory, which the daemon creates and restricts, rather
+# than directly in the shared temp folder where any user could claim the name first. Sharing one
+# daemon between users is opt-in through --socket/--owner
+DEFAULT_SOCKET_DIR = os.path.join(tempfile.gettempdir(), 'hdb_model-{}'.format(
+    os.getuid() if hasattr(os, 'getuid') else 'user'))
+DEFAULT_SOCKET_PATH = os.path.join(DEFAULT_SOCKET_DIR, 'hdb_model.sock')
+
+# Every message is a frame: 1-byte op code, 4-byte payload length, payload
+OP_PREDICT = 1
+OP_INFO = 2
+OP_RELOAD = 3
+OP_ERROR = 255
+
+FRAME_HEADER = struct.Struct('!BI')
+NUMERIC_FIELDS = ('floor_area_sqm', 'remaining_lease')
+
+
+def pack_str(value):
+    data = value.encode('utf-8')
+    return struct.pack('!H', len(data)) + data
+
+
+def unpack_str(payload, offset):
+    length, = struct.unpack_from('!H', payload, offset)
+    offset += 2
+    return payload[offset:offset + length].decode('utf-8'), offset + length
+
+
+def recv_exact(sock, size):
+    chunks = []
+    while size > 0:
+        chunk = sock.recv(size)
+        if not chunk:
+            return None
+        chunks.append(chunk)
+        size -= len(chunk)
+    return b''.join(chunks)
+
+
+def read_frame(sock):
+    header = recv_exact(sock, FRAME_HEADER.size)
+    if header is None:
+        return None
+    op, length = FRAME_HEADER.unpack(header)
+    payload = recv_exact(sock, length) if length else b''
+    if payload is None:
+        return None
+    return op, payload
+
+
+def send_frame(sock, op, payload=b''):
+    sock.sendall(FRAME_HEADER.pack(op, len(payload)) + payload)
+
+
+def resolve_uid(owner=None):
+    # owner is a user name or uid; None means the current user
+    if owner is None:
+        return os.getuid()
+    if isinstance(owner, int) or str(owner).isdigit():
+        return int(owner)
+    import pwd
+    try:
+        return pwd.getpwnam(owner).pw_uid
+    except KeyError:
+        raise ValueError("Unknown user {}".format(owner))
+
+
+def check_socket_owner(socket_path, uid):
+    # Refuse to talk to a socket someone else could have planted: the socket must belong to the
+    # expected daemon user, and its directory must not let other users swap it out
+    directory = os.path.dirname(os.path.abspath(socket_path))
+    directory_stat = os.stat(directory)
+    if directory_stat.st_uid not in (uid, 0):
+        raise PermissionError("{} is not owned by the model daemon's user".format(directory))
+    if directory_stat.st_mode & 0o022 and not directory_stat.st_mode & stat.S_ISVTX:
+        raise PermissionError("{} is writable by other users".format(directory))
+    if os.stat(socket_path).st_uid != uid:
+        raise PermissionError("{} is not owned by the model daemon's user".format(socket_path))
+
+
+def encode_predict_request(inputs_list):
+    # Field header (name + 'd' for float64 or 's' for string), then the values row by row
+    fields = []
+    for inputs in inputs_list:
+        for key in inputs:
+            if key not in fields:
+                fields.append(key)
+
+    parts = [struct.pack('!HI', len(fields), len(inputs_list))]
+    for field in fields:
+        parts.append(pack_str(field))
+        parts.append(b'd' if field in NUMERIC_FIELDS else b's')
+    for inputs in inputs_list:
+        for field in fields:
+            if field in NUMERIC_FIELDS:
+                parts.append(struct.pack('!d', float(inputs.get(field, 0.0))))
+            else:
+                parts.append(pack_str(str(inputs.get(field, ''))))
+    return b''.join(parts)
+
+
+def decode_predict_request(payload):
+    n_fields, n_rows = struct.unpack_from('!HI', payload, 0)
+    offset = 6
+    fields = []
+    for _ in range(n_fields):
+        name, offset = unpack_str(payload, offset)
+        fields.append((name, payload[offset:offset + 1] == b'd'))
+        offset += 1
+
+    inputs_list = []
+    for _ in range(n_rows):
+        inputs = {}
+        for name, is_numeric in fields:
+            if is_numeric:
+                inputs[name], = struct.unpack_from('!d', payload, offset)
+                offset += 8
+            else:
+                inputs[name], offset = unpack_str(payload, offset)
+        inputs_list.append(inputs)
+    return inputs_list
+
+
+def encode_predict_response(version, baseline_price, predictions, contributions):
+    # Model version, the baseline price the contributions are measured against, row count,
+    # contribution names once, then one float64 row per prediction: [price, contribution_1, ...]
+    names = list(contributions[0].keys()) if contributions else []
+    parts = [struct.pack('!IdIH', version, baseline_price, len(predictions), len(names))]
+    parts.extend(pack_str(name) for name in names)
+    values = []
+    for prediction, row in zip(predictions, contributions):
+        values.append(float(prediction))
+        values.extend(float(row[name]) for name in names)
+    parts.append(struct.pack('!{}d'.format(len(values)), *values))
+    return b''.join(parts)
+
+
+def decode_predict_response(payload):
+    version, baseline_price, n_rows, n_names = struct.unpack_from('!IdIH', payload, 0)
+    offset = struct.calcsize('!IdIH')
+    names = []
+    for _ in range(n_names):
+        name, offset = unpack_str(payload, offset)
+        names.append(name)
+
+    values = struct.unpack_from('!{}d'.format(n_rows * (n_names + 1)), payload, offset)
+    predictions = []
+    contributions = []
+    for row in range(n_rows):
+        row_values = values[row * (n_names + 1):(row + 1) * (n_names + 1)]
+        predictions.append(row_values[0])
+        contributions.append(dict(zip(names, row_values[1:])))
+    return version, baseline_price, predictions, contributions
+
+
+class HDBModelClient:
+    # Stands in for HDBPolynomialPriceModel wherever only predictions and model info are needed
+
+    def __init__(self, socket_path=DEFAULT_SOCKET_PATH, timeout=30.0, owner=None):
+        # owner is the user running the daemon (name or uid); by default it must be our own user
+        if not hasattr(socket, 'AF_UNIX'):
+            raise OSError("Unix sockets are not available on this platform")
+        check_socket_owner(socket_path, resolve_uid(owner))
+        self.socket_path = socket_path
+        self.sock = self._connect(timeout)
+
+    def _connect(self, timeout):
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout)
+        try:
+            sock.connect(self.socket_path)
+        except Exception:
+            sock.close()
+            raise
+        return sock
+
+    def close(self):
+        if self.sock is not None:
+            self.sock.close()
+            self.sock = None
+
+    def _exchange(self, sock, op, payload=b''):
+        send_frame(sock, op, payload)
+        frame = read_frame(sock)
+        if frame is None:
+            raise ConnectionError("Model daemon closed the connection")
+        reply_op, reply = frame
+        if reply_op == OP_ERROR:
+            raise ValueError(reply.decode('utf-8'))
+        return reply
+
+    def _request(self, op, payload=b''):
+        if self.sock is None:
+            raise ConnectionError("Connection to the model daemon is closed")
+        try:
+            return self._exchange(self.sock, op, payload)
+        except socket.timeout:
+            # The daemon's late reply would otherwise be read as the answer to the next request
+            self.close()
+            raise
+
+    def info(self):
+        # Not cached: the daemon may swap in a new model version at any time
+        return json.loads(self._request(OP_INFO).decode('utf-8'))
+
+    def reload_model(self):
+        # Only the daemon's owner may reload; returns the version now being served. A retrain can
+        # take minutes, so the reload waits on a connection of its own without a timeout
+        sock = self._connect(None)
+        try:
+            version, = struct.unpack('!I', self._exchange(sock, OP_RELOAD))
+        finally:
+            sock.close()
+        return version
+
+    def predict_prices(self, inputs_list):
+        version, baseline_price, predictions, contributions = decode_predict_response(
+            self._request(OP_PREDICT, encode_predict_request(inputs_list)))
+        return predictions, contributions, version, baseline_price
+
+    def predict_price(self, inputs):
+        predictions, contributions, version, baseline_price = self.predict_prices([inputs])
+        return predictions[0], contributions[0], version, baseline_price
+
+    @property
+    def is_trained(self):
+        return True
+
+    @property
+    def model_version(self):
+        return self.info()['version']
+
+    @property
+    def baseline_price(self):
+        return self.info()['baseline_price']
+
+    def get_model_metrics(self):
+        return self.info()['metrics']
+
+    def get_polynomial_equation_info(self):
+        return self.info()['polynomial_info']
+
+    def get_available_towns(self):
+        return self.info()['towns']
+
+    def get_available_flat_types(self):
+        return self.info()['flat_types']
+
+    def get_available_storey_ranges(self):
+        return self.info()['storey_ranges']
+
+    def get_available_flat_models(self):
+        return self.info()['flat_models']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Query the resident HDB model daemon")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH)
+    parser.add_argument('--owner', default=None, help="user running a shared daemon (default: yourself)")
+    parser.add_argument('--town', required=True)
+    parser.add_argument('--flat-type', required=True)
+    parser.add_argument('--storey-range', required=True)
+    parser.add_argument('--flat-model', required=True)
+    parser.add_argument('--floor-area', type=float, required=True)
+    parser.add_argument('--remaining-lease', type=float, required=True)
+    parser.add_argument('--block')
+    parser.add_argument('--street-name')
+    args = parser.parse_args()
+
+    inputs = {
+        'town': args.town,
+        'flat_type': args.flat_type,
+        'storey_range': args.storey_range,
+        'flat_model': args.flat_model,
+        'floor_area_sqm': args.floor_area,
+        'remaining_lease': args.remaining_lease
+    }
+    if args.block:
+        inputs['block'] = args.block
+    if args.street_name:
+        inputs['street_name'] = args.street_name
+
+    try:
+        client = HDBModelClient(args.socket, owner=args.owner)
+    except PermissionError as e:
+        print("[ERROR] Refusing to use the model daemon socket: {}".format(e))
+        return 1
+    except ValueError as e:
+        print("[ERROR] {}".format(e))
+        return 1
+    except (OSError, socket.error) as e:
+        print("[ERROR] Model daemon is not running at {} ({})".format(args.socket, e))
+        return 1
+
+    try:
+        prediction, contributions, version, baseline_price = client.predict_price(inputs)
+    except ValueError as e:
+        print("[ERROR] {}".format(e))
+        return 1
+    finally:
+        client.close()
+
+    print("Predicted HDB Price: SGD ${:,.2f} (model v{})".format(prediction, version))
+    print("  {:<18}: ${:,.0f}".format('Typical Flat', baseline_price))
+    for feature, contribution in contributions.items():
+        print("  {:<18}: {}${:,.0f}".format(feature, '+' if contribution >= 0 else '-', abs(contribution)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
+
+# SOURITRA SAMANTA (3C)
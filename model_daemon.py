@@ -0,0 +1,233 @@
+# SOURITRA SAMANTA (3C)
+
+# Resident model daemon: trains (or loads) one HDBPolynomialPriceModel and serves it over a local
+# Unix socket, so every CLI session on the machine shares a single model in memory.
+
+import argparse
+import json
+import numbers
+import os
+import socket
+import socketserver
+import stat
+import struct
+
+from hdb_polynomial_model import HDBPolynomialPriceModel
+from data_processor import HDBDataProcessor
+from model_client import (DEFAULT_SOCKET_PATH, OP_ERROR, OP_INFO, OP_PREDICT, OP_RELOAD,
+                          decode_predict_request, encode_predict_response, read_frame,
+                          send_frame)
+
+
+def peer_uid(sock):
+    # Uid of the process on the other end of a Unix socket, or None where the OS does not report it
+    if not hasattr(socket, 'SO_PEERCRED'):
+        return None
+    credentials = sock.getsockopt(socket.SOL_SOCKET, socket.SO_PEERCRED, struct.calcsize('3i'))
+    _, uid, _ = struct.unpack('3i', credentials)
+    return uid
+
+
+class _ModelRequestHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        # A connection stays open for any number of requests until the client disconnects
+        uid = peer_uid(self.request)
+        while True:
+            frame = read_frame(self.request)
+            if frame is None:
+                return
+            op, payload = frame
+            try:
+                reply_op, reply = self.server.model_daemon.dispatch(op, payload, uid)
+            except Exception as e:
+                reply_op, reply = OP_ERROR, str(e).encode('utf-8')
+            send_frame(self.request, reply_op, reply)
+
+
+# socketserver only defines the Unix server classes where AF_UNIX exists (not on Windows),
+# so the module must stay importable without them; main() reports the missing support
+if hasattr(socket, 'AF_UNIX'):
+    class _ModelServer(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+        daemon_threads = True
+else:
+    _ModelServer = None
+
+
+class HDBModelDaemon:
+    def __init__(self, model, socket_path=DEFAULT_SOCKET_PATH, model_path=None, months=None,
+                 mode=0o660, group=None):
+        self.model = model
+        self.socket_path = socket_path
+        # Who may connect: the socket gets this mode (and group, a name or gid) as soon as it is bound
+        self.mode = mode
+        self.group = group
+        # A reload re-reads model_path if the daemon was started from a saved model, otherwise it
+        # retrains on the same window; clients never choose what gets loaded
+        self.model_path = model_path
+        self.months = months
+        self.server = None
+
+    def dispatch(self, op, payload, uid=None):
+        if op == OP_PREDICT:
+            # predict_prices reads one snapshot, so a concurrent retrain or reload never splits a batch
+            predictions, contributions, version, baseline_price = self.model.predict_prices(
+                decode_predict_request(payload))
+            return OP_PREDICT, encode_predict_response(version, baseline_price, predictions, contributions)
+        if op == OP_INFO:
+            return OP_INFO, json.dumps(self.model_info()).encode('utf-8')
+        if op == OP_RELOAD:
+            return OP_RELOAD, struct.pack('!I', self.reload(uid))
+        raise ValueError("Unknown request type {}".format(op))
+
+    def reload(self, uid):
+        # Runs before replying, so a failed reload reaches the client as OP_ERROR; predictions
+        # from other connections keep using the current version until the new one is published
+        if uid is None or uid != os.getuid():
+            raise PermissionError("Only the user running the model daemon can reload it")
+        if self.model_path is not None:
+            return self.model.load_model(self.model_path)
+        self.model.train_model(self.months)
+        return self.model.model_version
+
+    def model_info(self):
+        # numpy floats are not JSON serialisable; the sample and feature counts stay ints
+        metrics = dict((key, int(value) if isinstance(value, numbers.Integral) else float(value))
+                       for key, value in self.model.get_model_metrics().items())
+        polynomial_info = self.model.get_polynomial_equation_info()
+        return {
+            'version': self.model.model_version,
+            'baseline_price': self.model.baseline_price,
+            'metrics': metrics,
+            'polynomial_info': {
+                'degree': polynomial_info['degree'],
+                'n_features': int(polynomial_info['n_features']),
+                'feature_names': list(polynomial_info['feature_names']),
+                'version': polynomial_info['version']
+            },
+            'towns': [str(town) for town in self.model.get_available_towns()],
+            'flat_types': [str(flat_type) for flat_type in self.model.get_available_flat_types()],
+            'storey_ranges': [str(storey) for storey in self.model.get_available_storey_ranges()],
+            'flat_models': [str(flat_model) for flat_model in self.model.get_available_flat_models()]
+        }
+
+    def _resolve_gid(self):
+        if self.group is None:
+            return -1
+        if isinstance(self.group, int) or str(self.group).isdigit():
+            return int(self.group)
+        import grp
+        try:
+            return grp.getgrnam(self.group).gr_gid
+        except KeyError:
+            raise ValueError("Unknown group {}".format(self.group))
+
+    def _prepare_socket_dir(self):
+        # Nobody else may be able to plant or replace the socket, so its directory must belong to
+        # us (or root) and be writable only by its owner. An existing directory is checked but
+        # never changed; only one we create here gets the search bits the socket mode needs
+        directory = os.path.dirname(os.path.abspath(self.socket_path))
+        if not os.path.isdir(directory):
+            os.makedirs(directory, 0o700)
+            directory_mode = 0o700
+            if self.mode & 0o060:
+                directory_mode |= 0o010
+            if self.mode & 0o006:
+                directory_mode |= 0o001
+            os.chown(directory, -1, self._resolve_gid())
+            os.chmod(directory, directory_mode)
+            return
+
+        directory_stat = os.stat(directory)
+        if directory_stat.st_uid not in (os.getuid(), 0) or directory_stat.st_mode & 0o022:
+            raise RuntimeError("{} belongs to another user or is writable by other users; "
+                               "choose a different --socket location".format(directory))
+
+    def _secure_socket(self):
+        os.chown(self.socket_path, -1, self._resolve_gid())
+        os.chmod(self.socket_path, self.mode)
+
+    def _remove_stale_socket(self):
+        # Only a socket left behind by a daemon that exited is removed, never another kind of file
+        try:
+            path_stat = os.stat(self.socket_path)
+        except FileNotFoundError:
+            return
+        if not stat.S_ISSOCK(path_stat.st_mode):
+            raise RuntimeError("{} exists and is not a socket; choose a different --socket "
+                               "location".format(self.socket_path))
+        probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        try:
+            probe.connect(self.socket_path)
+        except (OSError, socket.error):
+            os.remove(self.socket_path)
+            return
+        finally:
+            probe.close()
+        raise RuntimeError("A model daemon is already running at {}".format(self.socket_path))
+
+    def serve_forever(self):
+        if _ModelServer is None:
+            raise RuntimeError("Unix sockets are not available on this platform")
+        self._prepare_socket_dir()
+        self._remove_stale_socket()
+        self.server = _ModelServer(self.socket_path, _ModelRequestHandler, bind_and_activate=False)
+        self.server.model_daemon = self
+        try:
+            self.server.server_bind()
+            self._secure_socket()
+            self.server.server_activate()
+        except Exception:
+            self.server.server_close()
+            raise
+        print("[SUCCESS] Serving model version {} on {}".format(self.model.model_version, self.socket_path))
+        try:
+            self.server.serve_forever()
+        finally:
+            self.server.server_close()
+            if os.path.exists(self.socket_path):
+                os.remove(self.socket_path)
+
+    def shutdown(self):
+        if self.server is not None:
+            self.server.shutdown()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Serve the HDB price model over a Unix socket")
+    parser.add_argument('--socket', default=DEFAULT_SOCKET_PATH,
+                        help="socket path; its directory is created and restricted to match --mode")
+    parser.add_argument('--mode', type=lambda value: int(value, 8), default=0o660,
+                        help="octal permissions of the socket (default 660: you and --group)")
+    parser.add_argument('--group', default=None, help="group whose members may connect")
+    parser.add_argument('--data', default='sample_data.csv')
+    parser.add_argument('--partitions', default='data_partitions')
+    parser.add_argument('--months', type=int, default=None, help="train on the latest N months only")
+    parser.add_argument('--model', default=None, help="serve a model saved with save_model instead of training")
+    args = parser.parse_args()
+
+    if not hasattr(socket, 'AF_UNIX'):
+        print("[ERROR] Unix sockets are not available on this platform")
+        return
+
+    model = HDBPolynomialPriceModel()
+    model_path = os.path.abspath(args.model) if args.model else None
+    if model_path:
+        model.load_model(model_path)
+    else:
+        HDBDataProcessor().prepare_partitions(args.data, args.partitions)
+        model.load_data(args.partitions, months=args.months)
+        model.train_model(months=args.months)
+
+    daemon = HDBModelDaemon(model, args.socket, model_path, args.months, args.mode, args.group)
+    try:
+        daemon.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[SUCCESS] Model daemon stopped")
+    except (OSError, RuntimeError, ValueError) as e:
+        print("[ERROR] {}".format(e))
+
+
+if __name__ == "__main__":
+    main()
+
+# SOURITRA SAMANTA (3C)
@@ -27,10 +27,10 @@ class HDBVisualizer:
         if not os.path.exists(self.output_dir):
             os.makedirs(self.output_dir)
 
-    def generate_prediction_summary_visuals(self, model, inputs, prediction, contributions):
+    def generate_prediction_summary_visuals(self, model, inputs, prediction, contributions, baseline_price=None):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
 
-        self._create_feature_contribution_chart(contributions, timestamp)
+        self._create_feature_contribution_chart(contributions, timestamp, baseline_price)
 
         self._create_price_comparison_scatter(model, inputs, prediction, timestamp)
 
@@ -43,11 +43,12 @@ class HDBVisualizer:
             "{}/market_heatmap_{}.png".format(self.output_dir, timestamp)
         ]
 
-    def _create_feature_contribution_chart(self, contributions, timestamp):
+    def _create_feature_contribution_chart(self, contributions, timestamp, baseline_price=None):
         plt.figure(figsize=(12, 8))
 
         features = list(contributions.keys())
         values = list(contributions.values())
+        label_offset = max(abs(value) for value in values) * 0.01
 
         try:
             colors = plt.cm.RdYlBu_r(np.linspace(0, 1, len(features)))
@@ -55,13 +56,23 @@ class HDBVisualizer:
             colors = plt.cm.viridis(np.linspace(0, 1, len(features)))
         bars = plt.barh(features, values, color=colors) # souritra (watermark)
 
+        plt.axvline(0, color='black', linewidth=1)
         plt.title('Feature Contributions to HDB Price Prediction', fontsize=16, fontweight='bold', pad=20)
-        plt.xlabel('Contribution Score', fontsize=12)
+        if baseline_price is not None:
+            plt.xlabel('Contribution vs. Typical Flat at ${:,.0f} (SGD)'.format(baseline_price), fontsize=12)
+        else:
+            plt.xlabel('Contribution (SGD)', fontsize=12)
         plt.ylabel('Features', fontsize=12)
 
         for i, (bar, value) in enumerate(zip(bars, values)):
-            plt.text(value + max(values) * 0.01, bar.get_y() + bar.get_height() / 2,
-                     '{:.1f}'.format(value), ha='left', va='center', fontweight='bold')
+            offset = label_offset if value >= 0 else -label_offset
+            plt.text(value + offset, bar.get_y() + bar.get_height() / 2,
+                     '{}${:,.0f}'.format('' if value >= 0 else '-', abs(value)),
+                     ha='left' if value >= 0 else 'right', va='center', fontweight='bold')
+
+        # Leave room for the value labels on both sides of the bars
+        x_min, x_max = plt.xlim()
+        plt.xlim(x_min - label_offset * 20, x_max + label_offset * 20)
 
         plt.grid(axis='x', alpha=0.3)
         plt.tight_layout()
@@ -82,26 +93,24 @@ class HDBVisualizer:
         comparison_flats = []
         comparison_prices = []
 
-        for town in towns: # souritra (watermark)
-            for flat_type in flat_types:
-                temp_inputs = inputs.copy()
-                temp_inputs['town'] = town
-                temp_inputs['flat_type'] = flat_type
-                pred_price, _ = model.predict_price(temp_inputs)
+        candidate_flats = [(town, flat_type) for town in towns for flat_type in flat_types]
+        candidate_inputs = []
+        for town, flat_type in candidate_flats: # souritra (watermark)
+            temp_inputs = inputs.copy()
+            temp_inputs['town'] = town
+            temp_inputs['flat_type'] = flat_type
+            candidate_inputs.append(temp_inputs)
+        candidate_prices, _, _, _ = model.predict_prices(candidate_inputs)
 
-                if price_lower <= pred_price <= price_upper:
-                    comparison_flats.append((town, flat_type))
-                    comparison_prices.append(pred_price)
+        for (town, flat_type), pred_price in zip(candidate_flats, candidate_prices):
+            if price_lower <= pred_price <= price_upper:
+                comparison_flats.append((town, flat_type))
+                comparison_prices.append(pred_price)
 
         if len(comparison_flats) == 0:
             diffs = []
-            for town in towns:
-                for flat_type in flat_types:
-                    temp_inputs = inputs.copy() # souritra (watermark)
-                    temp_inputs['town'] = town
-                    temp_inputs['flat_type'] = flat_type
-                    pred_price, _ = model.predict_price(temp_inputs)
-                    diffs.append((abs(pred_price - prediction), town, flat_type, pred_price))
+            for (town, flat_type), pred_price in zip(candidate_flats, candidate_prices):
+                diffs.append((abs(pred_price - prediction), town, flat_type, pred_price))
             diffs.sort(key=lambda x: x[0]) # souritra (watermark)
             diffs = diffs[:10]
             comparison_flats = [(x[1], x[2]) for x in diffs]
@@ -145,19 +154,16 @@ class HDBVisualizer:
         flat_types = model.get_available_flat_types()
         towns_sample = model.get_available_towns()[:12]
 
-        price_matrix = []
-
+        grid_inputs = []
         for town in towns_sample: # souritra (watermark)
-            town_prices = []
             for flat_type in flat_types:
                 temp_inputs = inputs.copy()
                 temp_inputs['town'] = town
                 temp_inputs['flat_type'] = flat_type
-                pred, _ = model.predict_price(temp_inputs)
-                town_prices.append(pred)
-            price_matrix.append(town_prices)
+                grid_inputs.append(temp_inputs)
 
-        price_matrix = np.array(price_matrix)
+        grid_prices, _, _, _ = model.predict_prices(grid_inputs)
+        price_matrix = np.array(grid_prices).reshape(len(towns_sample), len(flat_types))
 
         try:
             import seaborn as sns